@@ -2,8 +2,10 @@ import asyncio
 import csv
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from itertools import islice
+from typing import Dict, List, Set, Tuple
 
 import aiohttp
 import pandas as pd
@@ -11,6 +13,8 @@ from tqdm.asyncio import tqdm
 
 TOKEN = ""  # Set your SafetyCulture API token here
 BASE_URL = "https://api.safetyculture.io"
+# Unarchive request body, serialized once (content-type is set on the session)
+PUT_BODY = b'{"archived":false}'
 
 # Rate limiting configuration
 # SafetyCulture API typically allows ~1000 requests/minute
@@ -19,15 +23,24 @@ MAX_REQUESTS_PER_MINUTE = 800  # 13.33 requests/sec
 SEMAPHORE_VALUE = 30  # Optimal for 800/min (allows bursts with headroom)
 
 # Batch processing configuration
-BATCH_SIZE = 5000  # Process inspections in chunks to reduce memory usage
+BATCH_SIZE = 5000  # Log batch-level stats every N completed inspections
+TASK_WINDOW = SEMAPHORE_VALUE * 2  # Max tasks in flight; refilled as each completes
 
 # CSV buffering configuration
-CSV_BUFFER_SIZE = 100  # Flush CSV every N records for balance of I/O efficiency and real-time visibility
+CSV_BUFFER_SIZE = 2000  # Flush CSV every N records to cut writer wakeups and syscalls
+CSV_BYTES_THRESHOLD = 256 * 1024  # Or flush early once buffered rows reach ~256 KiB
+
+# Output columns; result rows are positional tuples in this order
+CSV_FIELDNAMES = ("audit_id", "status", "error_message", "timestamp")
+ResultRow = Tuple[str, str, str, str]
+STATUS_OK = "SUCCESS"
+STATUS_ERR = "ERROR"
 
 # Retry configuration
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2  # seconds
 RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+_BACKOFFS = tuple(RETRY_BASE_DELAY * (2**i) for i in range(MAX_RETRIES))
 
 
 class InspectionUnarchiver:
@@ -43,14 +56,24 @@ class InspectionUnarchiver:
         self.csv_file_handle = None
         self.csv_writer = None
         self.rate_limiter = None
-        # CSV buffering for I/O efficiency
-        self.csv_buffer = []
-        self.buffer_lock = asyncio.Lock()
+        # Results are queued and batched to disk by a single consumer task
+        self._queue = None
+        self._writer_task = None
+        # Single writer thread keeps CSV writes ordered and off the event loop
+        self._io_exec = None
+        # (epoch second, formatted timestamp) reused by tasks in the same second
+        self._ts_cache = (0, "")
 
     async def __aenter__(self):
         # Configure aiohttp session with connection pooling
+        # One warm keep-alive connection per concurrent task (single host)
         connector = aiohttp.TCPConnector(
-            limit=100, limit_per_host=50, ttl_dns_cache=300, use_dns_cache=True
+            limit=SEMAPHORE_VALUE,
+            limit_per_host=SEMAPHORE_VALUE,
+            ttl_dns_cache=600,
+            use_dns_cache=True,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75,
         )
         timeout = aiohttp.ClientTimeout(total=60, connect=10)
         self.session = aiohttp.ClientSession(
@@ -61,85 +84,109 @@ class InspectionUnarchiver:
         # Set up rate limiter
         self.rate_limiter = TokenBucketRateLimiter(MAX_REQUESTS_PER_MINUTE)
 
+        self._io_exec = ThreadPoolExecutor(max_workers=1)
+
         # Set up output CSV with resume support
         csv_filename = "unarchive_results.csv"
         if os.path.exists(csv_filename):
             # Resume mode: append to existing file
             self.csv_file_handle = open(csv_filename, "a", newline="", encoding="utf-8")
-            self.csv_writer = csv.DictWriter(
-                self.csv_file_handle,
-                fieldnames=[
-                    "audit_id",
-                    "status",
-                    "error_message",
-                    "timestamp",
-                ],
-            )
+            self.csv_writer = csv.writer(self.csv_file_handle)
             # Don't write header when appending
             print(f"📝 Resuming: Appending to existing {csv_filename}")
         else:
             # Fresh start: create new file with header
             self.csv_file_handle = open(csv_filename, "w", newline="", encoding="utf-8")
-            self.csv_writer = csv.DictWriter(
-                self.csv_file_handle,
-                fieldnames=[
-                    "audit_id",
-                    "status",
-                    "error_message",
-                    "timestamp",
-                ],
-            )
-            self.csv_writer.writeheader()
+            self.csv_writer = csv.writer(self.csv_file_handle)
+            self.csv_writer.writerow(CSV_FIELDNAMES)
             print(f"📝 Starting fresh: Creating {csv_filename}")
 
         self.csv_file_handle.flush()
 
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._csv_consumer())
+
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        # Flush any remaining buffered results before closing
-        if self.csv_buffer:
-            async with self.buffer_lock:
-                await self._flush_csv_buffer()
-
-        if self.csv_file_handle:
-            self.csv_file_handle.close()
-        if self.session:
-            await self.session.close()
+        try:
+            # Signal the consumer and wait for it to flush remaining results
+            if self._writer_task:
+                self._queue.put_nowait(None)
+                await self._writer_task
+        finally:
+            if self._io_exec:
+                self._io_exec.shutdown(wait=True)
+            if self.csv_file_handle:
+                self.csv_file_handle.close()
+            if self.session:
+                await self.session.close()
+
+    def _write_result_to_csv_buffered(self, result: ResultRow):
+        """
+        Queue a result for the CSV consumer. Never blocks the calling task.
+        Re-raises the consumer's error if a write has already failed.
+        """
+        if self._writer_task.done():
+            # The consumer only stops early on a failed write; don't drop rows
+            self._writer_task.result()
+        self._queue.put_nowait(result)
 
-    async def _write_result_to_csv_buffered(self, result: Dict):
+    async def _csv_consumer(self):
         """
-        Buffer CSV writes and flush periodically for I/O efficiency.
-        Thread-safe for concurrent async access.
+        Drain queued results into batches and write them to CSV.
+        Flushes on whichever of the row-count or byte threshold is hit first,
+        and writes whatever is left once the None sentinel arrives.
         """
-        async with self.buffer_lock:
-            self.csv_buffer.append(result)
+        batch: List[ResultRow] = []
+        batch_bytes = 0
+        while True:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch.append(row)
+            batch_bytes += sum(len(v) for v in row)
 
-            # Flush when buffer reaches threshold
-            if len(self.csv_buffer) >= CSV_BUFFER_SIZE:
-                await self._flush_csv_buffer()
+            if len(batch) >= CSV_BUFFER_SIZE or batch_bytes >= CSV_BYTES_THRESHOLD:
+                await self._write_rows(batch)
+                batch = []
+                batch_bytes = 0
 
-    async def _flush_csv_buffer(self):
+        if batch:
+            await self._write_rows(batch)
+
+    async def _write_rows(self, rows: List[ResultRow]):
         """
-        Flush buffered results to CSV.
-        Must be called with buffer_lock held.
+        Encode and write rows on the I/O thread so the event loop keeps
+        servicing HTTP requests during the flush.
         """
-        if not self.csv_buffer:
-            return
-
-        for result in self.csv_buffer:
-            self.csv_writer.writerow(result)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._io_exec, self._sync_writerows, rows)
 
+    def _sync_writerows(self, rows: List[ResultRow]):
+        self.csv_writer.writerows(rows)
         self.csv_file_handle.flush()
-        self.csv_buffer.clear()
+
+    def _now_str(self) -> str:
+        """
+        Return the current time as "%Y-%m-%d %H:%M:%S", formatting at most
+        once per second.
+        """
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            self._ts_cache = (
+                now,
+                datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        return self._ts_cache[1]
 
     async def unarchive_single_inspection(
         self, audit_id: str, progress_bar
-    ) -> Dict[str, any]:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ) -> ResultRow:
+        timestamp = self._now_str()
 
         async with self.semaphore:
-            # Rate limiting
+            # Rate limiting: one token per inspection, retries don't spend more
             await self.rate_limiter.acquire()
 
             url = f"{BASE_URL}/audits/{audit_id}"
@@ -147,23 +194,15 @@ class InspectionUnarchiver:
             for attempt in range(MAX_RETRIES):
                 try:
                     # Unarchive endpoint requires archived: false in JSON body
-                    async with self.session.put(
-                        url, json={"archived": False}
-                    ) as response:
+                    async with self.session.put(url, data=PUT_BODY) as response:
                         if response.status == 200:
-                            result = {
-                                "audit_id": audit_id,
-                                "status": "SUCCESS",
-                                "error_message": "",
-                                "timestamp": timestamp,
-                            }
-
-                            log_msg = f"✅ Unarchived: {audit_id}"
+                            result = (audit_id, STATUS_OK, "", timestamp)
+
+                            # Successes only tick the bar; errors are logged below
                             if progress_bar:
-                                progress_bar.write(log_msg)
                                 progress_bar.update(1)
 
-                            await self._write_result_to_csv_buffered(result)
+                            self._write_result_to_csv_buffered(result)
                             return result
 
                         # Handle 429 with Retry-After header support
@@ -186,7 +225,7 @@ class InspectionUnarchiver:
                                 continue
                             else:
                                 # No Retry-After or invalid - use exponential backoff
-                                delay = RETRY_BASE_DELAY * (2**attempt)
+                                delay = _BACKOFFS[attempt]
                                 if progress_bar:
                                     progress_bar.write(
                                         f"⏳ Rate limited: {audit_id}, "
@@ -200,73 +239,68 @@ class InspectionUnarchiver:
                             response.status in RETRY_STATUS_CODES
                             and attempt < MAX_RETRIES - 1
                         ):
-                            delay = RETRY_BASE_DELAY * (2**attempt)
+                            delay = _BACKOFFS[attempt]
                             await asyncio.sleep(delay)
                             continue
 
                         # Non-retryable error
                         error_text = await response.text()
-                        result = {
-                            "audit_id": audit_id,
-                            "status": "ERROR",
-                            "error_message": f"HTTP {response.status}: {error_text[:200]}",
-                            "timestamp": timestamp,
-                        }
+                        result = (
+                            audit_id,
+                            STATUS_ERR,
+                            f"HTTP {response.status}: {error_text[:200]}",
+                            timestamp,
+                        )
 
                         log_msg = f"❌ Error: {audit_id} - HTTP {response.status}"
                         if progress_bar:
                             progress_bar.write(log_msg)
                             progress_bar.update(1)
 
-                        await self._write_result_to_csv_buffered(result)
+                        self._write_result_to_csv_buffered(result)
                         return result
 
                 except (aiohttp.ClientError, asyncio.TimeoutError) as error:
                     if attempt < MAX_RETRIES - 1:
-                        delay = RETRY_BASE_DELAY * (2**attempt)
+                        delay = _BACKOFFS[attempt]
                         await asyncio.sleep(delay)
                         continue
 
-                    result = {
-                        "audit_id": audit_id,
-                        "status": "ERROR",
-                        "error_message": f"{type(error).__name__}: {str(error)}",
-                        "timestamp": timestamp,
-                    }
+                    result = (
+                        audit_id,
+                        STATUS_ERR,
+                        f"{type(error).__name__}: {str(error)}",
+                        timestamp,
+                    )
 
                     log_msg = f"❌ Error: {audit_id} - {type(error).__name__}"
                     if progress_bar:
                         progress_bar.write(log_msg)
                         progress_bar.update(1)
 
-                    await self._write_result_to_csv_buffered(result)
+                    self._write_result_to_csv_buffered(result)
                     return result
 
             # Max retries exceeded
-            result = {
-                "audit_id": audit_id,
-                "status": "ERROR",
-                "error_message": "Max retries exceeded",
-                "timestamp": timestamp,
-            }
+            result = (audit_id, STATUS_ERR, "Max retries exceeded", timestamp)
 
             log_msg = f"❌ Error: {audit_id} - Max retries exceeded"
             if progress_bar:
                 progress_bar.write(log_msg)
                 progress_bar.update(1)
 
-            await self._write_result_to_csv_buffered(result)
+            self._write_result_to_csv_buffered(result)
             return result
 
     async def unarchive_all_inspections(self, audit_ids: List[str]) -> Dict:
         """
-        Process inspections in batches to reduce memory footprint.
+        Process inspections through a sliding window of in-flight tasks.
 
         Key improvements:
-        - Only create tasks for current batch (5000 at a time)
-        - Memory: ~2.5 MB per batch vs 360 MB for all
-        - More responsive to interruptions
-        - Better progress visibility with batch-level updates
+        - At most TASK_WINDOW tasks exist at once; a new one starts as each finishes
+        - No idle gap waiting on the slowest request of a batch
+        - Memory stays flat regardless of input size
+        - Batch-level stats still logged every BATCH_SIZE completions
         """
         print(f"\n🚀 Starting bulk unarchive for {len(audit_ids)} inspections...")
         print(f"⚡ Rate limit: {MAX_REQUESTS_PER_MINUTE} requests per minute")
@@ -280,48 +314,62 @@ class InspectionUnarchiver:
         # Calculate total batches for progress tracking
         total_batches = (len(audit_ids) + BATCH_SIZE - 1) // BATCH_SIZE
 
+        pending_ids = iter(audit_ids)
+        active: Set[asyncio.Task] = set()
+        processed_count = 0
+        batch_num = 0
+        batch_success = 0
+        batch_error = 0
+
         with tqdm(total=len(audit_ids), desc="Unarchiving", unit="inspection") as pbar:
-            for batch_num in range(total_batches):
-                # Calculate batch slice
-                start_idx = batch_num * BATCH_SIZE
-                end_idx = min(start_idx + BATCH_SIZE, len(audit_ids))
-                batch = audit_ids[start_idx:end_idx]
-
-                # Update progress bar description with batch info
-                pbar.set_description(
-                    f"Unarchiving (Batch {batch_num + 1}/{total_batches})"
+            pbar.set_description(f"Unarchiving (Batch 1/{total_batches})")
+            while True:
+                # Top the window back up
+                for audit_id in islice(pending_ids, TASK_WINDOW - len(active)):
+                    active.add(
+                        asyncio.create_task(
+                            self.unarchive_single_inspection(audit_id, pbar)
+                        )
+                    )
+
+                if not active:
+                    break
+
+                done, active = await asyncio.wait(
+                    active, return_when=asyncio.FIRST_COMPLETED
                 )
 
-                # Create tasks ONLY for this batch
-                tasks = [
-                    self.unarchive_single_inspection(audit_id, pbar)
-                    for audit_id in batch
-                ]
-
-                # Execute batch
-                batch_results = await asyncio.gather(*tasks)
-
                 # Aggregate results
-                batch_success = 0
-                batch_error = 0
-                for result in batch_results:
-                    if result["status"] == "SUCCESS":
+                for task in done:
+                    if task.result()[1] == STATUS_OK:
                         results["success"] += 1
                         batch_success += 1
                     else:
                         results["error"] += 1
                         batch_error += 1
+                    processed_count += 1
 
-                # Log batch completion with stats
-                elapsed = time.time() - start_time
-                processed_count = start_idx + len(batch)
-                rate = (processed_count / elapsed * 60) if elapsed > 0 else 0
-                pbar.write(
-                    f"📦 Batch {batch_num + 1}/{total_batches} complete | "
-                    f"Rate: {rate:.1f} req/min | "
-                    f"Success: {batch_success}/{len(batch)} | "
-                    f"Errors: {batch_error}"
-                )
+                    if processed_count % BATCH_SIZE and processed_count != len(
+                        audit_ids
+                    ):
+                        continue
+
+                    # Log batch completion with stats
+                    batch_num += 1
+                    elapsed = time.time() - start_time
+                    rate = (processed_count / elapsed * 60) if elapsed > 0 else 0
+                    pbar.write(
+                        f"📦 Batch {batch_num}/{total_batches} complete | "
+                        f"Rate: {rate:.1f} req/min | "
+                        f"Success: {batch_success}/{batch_success + batch_error} | "
+                        f"Errors: {batch_error}"
+                    )
+                    batch_success = 0
+                    batch_error = 0
+                    if batch_num < total_batches:
+                        pbar.set_description(
+                            f"Unarchiving (Batch {batch_num + 1}/{total_batches})"
+                        )
 
         results["total_time_seconds"] = round(time.time() - start_time, 2)
         return results
@@ -329,105 +377,105 @@ class InspectionUnarchiver:
 
 class TokenBucketRateLimiter:
     """
-    Lock-free token bucket rate limiter allowing concurrent access.
+    Lock-free token bucket rate limiter using virtual time slots.
 
     Key improvements over previous RateLimiter:
-    - No lock serialization - multiple tasks can acquire simultaneously
-    - Supports bursts up to semaphore limit while maintaining average rate
-    - Lock only used for token refill calculation, not for waiting
+    - No lock at all - each caller claims the next time slot and sleeps to it
+    - Slot claim has no await, so it is atomic on the single-threaded event loop
+    - Supports bursts up to burst_size while maintaining average rate
     """
 
     def __init__(self, requests_per_minute: int, burst_size: int = None):
-        self.rate = requests_per_minute / 60.0  # tokens per second
+        self._interval = 60.0 / requests_per_minute  # seconds per request
         self.burst_size = burst_size or requests_per_minute  # max bucket capacity
-        self.tokens = float(self.burst_size)  # start with full bucket
-        self.last_refill = time.time()
-        self._lock = asyncio.Lock()  # Only for token refill calculation
+        # Slots may lag "now" so that a full bucket of burst_size runs at once
+        self._burst_window = (self.burst_size - 1) * self._interval
+        self._next_slot_time = time.monotonic() - self._burst_window
 
     async def acquire(self):
         """
-        Acquire a token to make a request.
-        Uses lock ONLY for refill calculation, not for waiting.
-        Multiple tasks can wait concurrently without blocking each other.
+        Acquire a time slot to make a request.
+        Claims the next free slot and sleeps until it arrives; no retry loop.
         """
-        while True:
-            async with self._lock:
-                now = time.time()
-                # Refill tokens based on time elapsed
-                elapsed = now - self.last_refill
-                self.tokens = min(self.burst_size, self.tokens + elapsed * self.rate)
-                self.last_refill = now
-
-                if self.tokens >= 1.0:
-                    self.tokens -= 1.0
-                    return  # Token acquired, exit immediately
-
-                # Calculate how long to wait for next token
-                wait_time = (1.0 - self.tokens) / self.rate
+        now = time.monotonic()
+        slot = max(self._next_slot_time, now - self._burst_window)
+        self._next_slot_time = slot + self._interval
 
-            # Sleep OUTSIDE the lock so other tasks can check bucket
+        wait_time = slot - now
+        if wait_time > 0:
             await asyncio.sleep(wait_time)
 
 
-def load_completed_audit_ids(csv_path: str = "unarchive_results.csv") -> set:
+def load_completed_audit_ids(csv_path: str = "unarchive_results.csv") -> pd.Index:
     """
     Load already-processed audit IDs from previous runs.
-    Returns set of audit_ids that were successfully processed or errored.
+    Returns a unique Index of audit_ids that were successfully processed or errored.
 
     Both SUCCESS and ERROR are considered "processed" to avoid duplicate attempts.
     User can filter errors from CSV and retry them separately if needed.
     """
     if not os.path.exists(csv_path):
-        return set()
+        return pd.Index([])
 
     try:
-        df = pd.read_csv(csv_path)
+        # Only parse audit_id; error_message can hold long strings
+        df = pd.read_csv(
+            csv_path,
+            usecols=lambda column: column == "audit_id",
+            dtype={"audit_id": "string"},
+            engine="c",
+        )
 
         if "audit_id" not in df.columns:
             print(f"⚠️  Warning: {csv_path} missing audit_id column")
-            return set()
+            return pd.Index([])
 
         # Consider both SUCCESS and ERROR as "processed"
-        completed_ids = set(df["audit_id"].astype(str).str.strip())
+        completed_ids = pd.Index(df["audit_id"].str.strip()).unique()
         print(f"📋 Resuming: Found {len(completed_ids)} already-processed IDs")
         return completed_ids
 
     except Exception as error:
         print(f"⚠️  Warning: Could not read {csv_path}: {error}")
         print("Starting fresh...")
-        return set()
+        return pd.Index([])
 
 
-def load_input_csv() -> List[str]:
+def load_input_csv() -> pd.Index:
     input_file = "input.csv"
 
     if not os.path.exists(input_file):
         print(f"❌ Error: {input_file} not found")
         print("Please create input.csv with column: audit_id")
-        return []
+        return pd.Index([])
 
     try:
-        df = pd.read_csv(input_file)
+        df = pd.read_csv(
+            input_file,
+            usecols=lambda column: column == "audit_id",
+            dtype={"audit_id": "string"},
+            engine="c",
+        )
 
         if "audit_id" not in df.columns:
             print("❌ Error: input.csv missing required column: audit_id")
-            return []
+            return pd.Index([])
 
         df = df.dropna(subset=["audit_id"])
-        df["audit_id"] = df["audit_id"].astype(str).str.strip()
+        df["audit_id"] = df["audit_id"].str.strip()
 
-        audit_ids = df["audit_id"].tolist()
+        audit_ids = pd.Index(df["audit_id"])
 
-        if not audit_ids:
+        if audit_ids.empty:
             print("❌ Error: No valid audit IDs found in input.csv")
-            return []
+            return audit_ids
 
         print(f"📋 Loaded {len(audit_ids)} inspection IDs from {input_file}")
         return audit_ids
 
     except Exception as error:
         print(f"❌ Error reading {input_file}: {error}")
-        return []
+        return pd.Index([])
 
 
 async def main():
@@ -442,15 +490,16 @@ async def main():
 
     # Load all audit IDs from input
     all_audit_ids = load_input_csv()
-    if not all_audit_ids:
+    if all_audit_ids.empty:
         return 1
 
     # Load completed IDs and filter for resume capability
     completed_ids = load_completed_audit_ids()
 
-    if completed_ids:
+    if not completed_ids.empty:
         original_count = len(all_audit_ids)
-        audit_ids = [aid for aid in all_audit_ids if aid not in completed_ids]
+        # Hash lookup runs in C; keeps input order (and any duplicates)
+        audit_ids = all_audit_ids[~all_audit_ids.isin(completed_ids)].tolist()
         skipped = original_count - len(audit_ids)
         print(f"✅ Skipping {skipped} already-processed inspections")
         print(f"📋 Remaining to process: {len(audit_ids)}")
@@ -459,7 +508,7 @@ async def main():
             print("\n🎉 All inspections already processed!")
             return 0
     else:
-        audit_ids = all_audit_ids
+        audit_ids = all_audit_ids.tolist()
 
     print("\n" + "=" * 80)
 
@@ -1,8 +1,15 @@
+import asyncio
 import csv
 import sys
-import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
-import requests
+import aiohttp
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json parses bytes too
+    from json import loads as json_loads
 
 TOKEN = ""  # Set your SafetyCulture API token here
 
@@ -12,7 +19,7 @@ REQUEST_TIMEOUT = 30
 BASE_BACKOFF = 1  # seconds
 
 
-def fetch_and_stream_to_csv(filename="issue_relations.csv"):
+async def fetch_and_stream_to_csv(filename="issue_relations.csv"):
     """Fetch issue relations with streaming CSV writes for maximum efficiency."""
     if not TOKEN:
         print("ERROR: TOKEN not set. Please set your API token in the script.")
@@ -28,106 +35,142 @@ def fetch_and_stream_to_csv(filename="issue_relations.csv"):
     csvfile = None
     fieldnames = None
 
-    try:
-        csvfile = open(filename, "w", newline="", encoding="utf-8")
+    headers = {"accept": "application/json", "authorization": f"Bearer {TOKEN}"}
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
 
-        while relative_url:
-            url = base_url + relative_url
-            headers = {"accept": "application/json", "authorization": f"Bearer {TOKEN}"}
+    # One pooled session so every page reuses the same keep-alive connection
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        pending = None
+        try:
+            # Large buffer: rows reach disk in big blocks, flushed on close
+            csvfile = open(
+                filename, "w", buffering=1 << 20, newline="", encoding="utf-8"
+            )
+            loop = asyncio.get_running_loop()
 
             # Fetch page with retry logic
-            data, next_page = fetch_page_with_retry(url, headers)
+            pending = asyncio.create_task(
+                fetch_page_with_retry(session, base_url + relative_url)
+            )
 
-            if not data:
-                break
+            while pending:
+                data, next_page = await pending
+                pending = None
 
-            # Initialize CSV writer on first page (when we know the fields)
-            if csv_writer is None:
-                fieldnames = data[0].keys()
-                csv_writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                csv_writer.writeheader()
+                if not data:
+                    break
 
-            # Stream: write this page immediately to disk
-            csv_writer.writerows(data)
-            csvfile.flush()  # Ensure data is written to disk
+                # Prefetch the next page so its round trip overlaps the CSV write
+                if next_page:
+                    pending = asyncio.create_task(
+                        fetch_page_with_retry(session, base_url + next_page)
+                    )
 
-            page_count += 1
-            total_items += len(data)
+                # Initialize CSV writer on first page (when we know the fields)
+                if csv_writer is None:
+                    fieldnames = data[0].keys()
+                    csv_writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    csv_writer.writeheader()
 
-            print(
-                f"Fetched page {page_count}, page items: {len(data)}, total items: {total_items}"
-            )
+                # Stream: write this page to disk off the event loop
+                await loop.run_in_executor(None, csv_writer.writerows, data)
 
-            relative_url = next_page
+                page_count += 1
+                total_items += len(data)
 
-        print(f"\nSaved {total_items} records to {filename}")
+                print(
+                    f"Fetched page {page_count}, page items: {len(data)}, total items: {total_items}"
+                )
 
-    finally:
-        if csvfile:
-            csvfile.close()
+            print(f"\nSaved {total_items} records to {filename}")
 
+        finally:
+            if pending:
+                pending.cancel()
+            if csvfile:
+                csvfile.close()
 
-def fetch_page_with_retry(url, headers):
+
+def parse_retry_after(value, default=60):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def fetch_page_with_retry(session, url):
     """Fetch a single page with exponential backoff retry logic."""
     for attempt in range(MAX_RETRIES):
+        body = b""
         try:
-            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            async with session.get(url) as response:
+                # Handle rate limiting
+                if response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    print(f"Rate limited. Waiting {retry_after:.0f} seconds...")
+                    await asyncio.sleep(retry_after)
+                    continue
 
-            # Handle rate limiting
-            if response.status_code == 429:
-                retry_after = int(response.headers.get("Retry-After", 60))
-                print(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
-                continue
+                body = await response.read()
 
             # Check for other HTTP errors
-            if response.status_code != 200:
-                print(f"HTTP {response.status_code}: {response.text}")
+            if response.status != 200:
+                print(f"HTTP {response.status}: {body.decode(errors='replace')}")
                 if attempt < MAX_RETRIES - 1:
                     backoff = BASE_BACKOFF * (2**attempt)
                     print(
                         f"Retrying in {backoff} seconds... (attempt {attempt + 1}/{MAX_RETRIES})"
                     )
-                    time.sleep(backoff)
+                    await asyncio.sleep(backoff)
                     continue
                 else:
                     print("Max retries reached. Exiting.")
                     sys.exit(1)
 
             # Parse JSON response
-            response_data = response.json()
+            response_data = json_loads(body)
             data = response_data.get("data", [])
             next_page = response_data.get("metadata", {}).get("next_page")
 
             return data, next_page
 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             print(f"Request timeout on attempt {attempt + 1}/{MAX_RETRIES}")
             if attempt < MAX_RETRIES - 1:
                 backoff = BASE_BACKOFF * (2**attempt)
                 print(f"Retrying in {backoff} seconds...")
-                time.sleep(backoff)
+                await asyncio.sleep(backoff)
             else:
                 print("Max retries reached due to timeouts. Exiting.")
                 sys.exit(1)
 
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             print(f"Network error on attempt {attempt + 1}/{MAX_RETRIES}: {e}")
             if attempt < MAX_RETRIES - 1:
                 backoff = BASE_BACKOFF * (2**attempt)
                 print(f"Retrying in {backoff} seconds...")
-                time.sleep(backoff)
+                await asyncio.sleep(backoff)
             else:
                 print("Max retries reached due to network errors. Exiting.")
                 sys.exit(1)
 
         except ValueError as e:
             print(f"JSON parsing error: {e}")
-            print("Response content:", response.text[:500])
+            print("Response content:", body[:500].decode(errors="replace"))
             sys.exit(1)
 
     return [], None
 
 
 if __name__ == "__main__":
-    fetch_and_stream_to_csv()
+    asyncio.run(fetch_and_stream_to_csv())
@@ -1,18 +1,51 @@
 import argparse
 import asyncio
-import json
+import csv
 import os
+import random
 import sys
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import aiohttp
 from tqdm import tqdm
 
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any) -> str:
+        # aiohttp expects str from json_serialize; orjson hands back bytes
+        return orjson.dumps(obj).decode()
+
+except ImportError:  # orjson is optional; fall back to stdlib json
+    from json import dumps as json_dumps
+    from json import loads as json_loads
+
 TOKEN = ""  # Set your SafetyCulture API token here
 
 DEFAULT_BASE_URL = "https://api.safetyculture.io"
 RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 30.0  # seconds
+RETRY_JITTER = 0.5  # up to +50% random spread so retries don't move in lockstep
+RETRY_AFTER_MAX_DELAY = 300.0  # Cap on a server's Retry-After, in seconds
 
 ACTION_PAGE_SIZE = 100
 ACTION_DELETE_BATCH_SIZE = 300
@@ -27,8 +60,22 @@ SITE_DELETE_BATCH_SIZE = 40
 DELETE_CONCURRENCY = 16
 LIST_CONCURRENCY = 8
 DELETE_FLUSH_THRESHOLD = 400
+GROUP_LISTERS = 5  # Resources listed at once in the largest run_nuke group
+PAGED_LISTERS = 2  # Of those, actions and OSHA cases keep list_concurrency pages out
+CONNECTOR_HEADROOM = 8  # Spare connections beyond deletes and listers
+PROGRESS_REFRESH_INTERVAL = 0.25  # seconds between progress bar redraws
+PROGRESS_MIN_ITERS = 50  # tqdm skips redraw checks for smaller increments
 FETCH_BAR_FORMAT = "{desc:<22} {n_fmt}{unit} [{elapsed}, {rate_fmt}]"
 DELETE_BAR_FORMAT = "{desc:<22} {n_fmt}/{total_fmt}{unit} [{elapsed}, {rate_fmt}]"
+_SENTINEL = object()  # Ends a _pipeline worker
+
+# Bound str.format templates for the end-of-run report lines
+_RUN_RESULT = "{badge} {name}: {deleted}/{fetched} deleted ({failed} failed)".format
+_SUMMARY = "{badge} {name}: deleted {deleted}/{fetched} (failed {failed})".format
+_SUMMARY_BATCHES = (
+    "{badge} {name}: deleted {deleted}/{fetched} "
+    "(failed {failed}, batches {batches})"
+).format
 
 
 @dataclass
@@ -46,8 +93,17 @@ class ResourceStats:
 
 
 class ProgressTracker:
-    def __init__(self, name: str, position: int = 0) -> None:
-        self._lock = asyncio.Lock()
+    """Lock-free counters; a background task pushes deltas to tqdm periodically."""
+
+    def __init__(self, name: str, position: Optional[int] = None) -> None:
+        self.fetched_count = 0
+        self.deleted_count = 0
+        interactive = sys.stderr.isatty()
+        bar_options = {
+            "disable": not interactive,
+            "mininterval": PROGRESS_REFRESH_INTERVAL,
+            "miniters": PROGRESS_MIN_ITERS,
+        }
         self.fetch_bar = tqdm(
             total=0,
             desc=f"{name} fetched",
@@ -56,6 +112,7 @@ class ProgressTracker:
             leave=False,
             bar_format=FETCH_BAR_FORMAT,
             position=position,
+            **bar_options,
         )
         self.delete_bar = tqdm(
             total=0,
@@ -64,40 +121,100 @@ class ProgressTracker:
             dynamic_ncols=True,
             leave=False,
             bar_format=DELETE_BAR_FORMAT,
-            position=position + 1,
+            # None lets tqdm pick free rows when several resources run at once
+            position=None if position is None else position + 1,
+            **bar_options,
+        )
+        # Bars are no-ops off a TTY (CI, redirected logs), so skip the redraw task
+        self._refresh_task: Optional[asyncio.Task] = (
+            asyncio.create_task(self._refresh_loop()) if interactive else None
         )
 
-    async def add_fetched(self, count: int) -> None:
-        if count <= 0:
-            return
-        async with self._lock:
-            self.fetch_bar.update(count)
-            self.delete_bar.total += count
+    def add_fetched(self, count: int) -> None:
+        if count > 0:
+            self.fetched_count += count
+
+    def add_deleted(self, count: int) -> None:
+        if count > 0:
+            self.deleted_count += count
+
+    def _refresh(self) -> None:
+        fetched_delta = self.fetched_count - self.fetch_bar.n
+        if fetched_delta:
+            self.fetch_bar.update(fetched_delta)
+            self.delete_bar.total = self.fetched_count
+        deleted_delta = self.deleted_count - self.delete_bar.n
+        if deleted_delta:
+            self.delete_bar.update(deleted_delta)
+        elif fetched_delta:
             self.delete_bar.refresh()
 
-    async def add_deleted(self, count: int) -> None:
-        if count <= 0:
-            return
-        async with self._lock:
-            self.delete_bar.update(count)
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_REFRESH_INTERVAL)
+            self._refresh()
 
     def close(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh()
         self.fetch_bar.close()
         self.delete_bar.close()
 
 
-def chunked(items: Sequence[str], size: int) -> Iterable[List[str]]:
+def load_site_ids(csv_path: str) -> List[str]:
+    """siteId column of a delete_sites-style input CSV, blanks and repeats dropped."""
+    with open(csv_path, newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.DictReader(csvfile)
+        if "siteId" not in (reader.fieldnames or []):
+            raise ValueError(f"{csv_path} has no siteId column")
+        site_ids = (row["siteId"] for row in reader)
+        return list(dict.fromkeys(site_id for site_id in site_ids if site_id))
+
+
+def chunked(items: Sequence[str], size: int) -> Iterable[Sequence[str]]:
     for i in range(0, len(items), size):
-        yield list(items[i : i + size])
+        yield items[i : i + size]
 
 
-def build_next_page(base_url: str, next_path: Optional[str]) -> Optional[str]:
-    if not next_path:
+def build_next_page(next_path: Optional[str]) -> Optional[str]:
+    """Feed next_page paths (or absolute URLs) for _request_json to resolve."""
+    if not next_path or next_path.startswith(("/", "http")):
+        return next_path or None
+    return f"/{next_path}"
+
+
+def make_resolver() -> Optional[aiohttp.abc.AbstractResolver]:
+    """c-ares resolver when aiodns is installed; None keeps aiohttp's default."""
+    if sys.platform == "win32":
+        # aiodns needs a selector event loop, which Windows doesn't use by default
+        return None
+    try:
+        return aiohttp.AsyncResolver()
+    except RuntimeError:  # aiodns not installed
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2**attempt))
+    return delay * (1 + random.random() * RETRY_JITTER)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
         return None
-    if next_path.startswith("http"):
-        return next_path
-    normalized = next_path if next_path.startswith("/") else f"/{next_path}"
-    return f"{base_url}{normalized}"
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 
 class SafetyCultureNuker:
@@ -110,9 +227,13 @@ class SafetyCultureNuker:
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.token = token
+        self.delete_concurrency = delete_concurrency
         self.delete_sem = asyncio.Semaphore(delete_concurrency)
         self.list_concurrency = list_concurrency
         self.session: Optional[aiohttp.ClientSession] = None
+        # Cleared on a 429 so every coroutine pauses until the quota window resets
+        self._rate_gate = asyncio.Event()
+        self._rate_gate.set()
 
     async def __aenter__(self) -> "SafetyCultureNuker":
         headers = {
@@ -120,15 +241,28 @@ class SafetyCultureNuker:
             "accept": "application/json",
             "content-type": "application/json",
         }
+        # Single-host API: every delete and list request in the busiest group
+        # can hold a connection at once
+        connection_limit = (
+            self.delete_concurrency
+            + PAGED_LISTERS * self.list_concurrency
+            + GROUP_LISTERS
+            - PAGED_LISTERS
+            + CONNECTOR_HEADROOM
+        )
         connector = aiohttp.TCPConnector(
-            limit=self.list_concurrency * 4,
-            limit_per_host=self.list_concurrency * 2,
+            limit=connection_limit,
+            limit_per_host=connection_limit,
             ttl_dns_cache=300,
             use_dns_cache=True,
+            resolver=make_resolver(),
         )
         timeout = aiohttp.ClientTimeout(total=120, connect=15)
         self.session = aiohttp.ClientSession(
-            headers=headers, connector=connector, timeout=timeout
+            headers=headers,
+            connector=connector,
+            timeout=timeout,
+            json_serialize=json_dumps,
         )
         return self
 
@@ -137,10 +271,13 @@ class SafetyCultureNuker:
             await self.session.close()
 
     def _url(self, path: str) -> str:
+        # Paths are joined by hand rather than via ClientSession(base_url=...) so a
+        # --base-url with a path keeps it and absolute feed links pass straight through
+        if path.startswith("/"):
+            return self.base_url + path
         if path.startswith("http"):
             return path
-        normalized = path if path.startswith("/") else f"/{path}"
-        return f"{self.base_url}{normalized}"
+        return f"{self.base_url}/{path}"
 
     async def _request_json(
         self,
@@ -156,37 +293,92 @@ class SafetyCultureNuker:
 
         url = self._url(path)
         for attempt in range(1, 5):
+            await self._rate_gate.wait()
             try:
                 async with self.session.request(
                     method, url, params=params, json=json_body
                 ) as response:
-                    text = await response.text()
                     if response.status in expected_status:
-                        if not text:
-                            return {}
+                        # Decode once; empty or non-JSON bodies mean "no data"
                         try:
-                            return await response.json()
-                        except aiohttp.ContentTypeError:
-                            try:
-                                return json.loads(text)
-                            except json.JSONDecodeError:
-                                return {}
+                            return (
+                                await response.json(loads=json_loads, content_type=None)
+                                or {}
+                            )
+                        except ValueError:
+                            return {}
                     if response.status in RETRY_STATUS_CODES and attempt < 4:
-                        await asyncio.sleep(2**attempt)
+                        delay = parse_retry_after(response.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = backoff_delay(attempt)
+                        # A far-off HTTP-date must not stall every worker for hours
+                        delay = min(delay, RETRY_AFTER_MAX_DELAY)
+                        if response.status == 429:
+                            self._close_rate_gate(delay)
+                        await asyncio.sleep(delay)
                         continue
+                    text = await response.text()
                     raise RuntimeError(
                         f"{method} {url} failed ({response.status}): {text}"
                     )
             except aiohttp.ClientError as error:
                 if attempt < 4:
-                    await asyncio.sleep(2**attempt)
+                    await asyncio.sleep(backoff_delay(attempt))
                     continue
                 raise RuntimeError(f"{method} {url} failed: {error}") from error
         return {}
 
+    def _close_rate_gate(self, delay: float) -> None:
+        if not self._rate_gate.is_set():
+            return
+        self._rate_gate.clear()
+        asyncio.get_running_loop().call_later(delay, self._rate_gate.set)
+
+    async def _pipeline(
+        self,
+        producer: Callable[[Callable[[Any], Awaitable[None]]], Awaitable[None]],
+        deleter: Callable[[Any], Awaitable[None]],
+        n_workers: int,
+    ) -> None:
+        """Run producer(emit) while n_workers drain emitted items into deleter."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=DELETE_FLUSH_THRESHOLD)
+
+        async def worker() -> None:
+            while (item := await queue.get()) is not _SENTINEL:
+                await deleter(item)
+
+        workers = [asyncio.create_task(worker()) for _ in range(n_workers)]
+        try:
+            await producer(queue.put)
+            for _ in workers:
+                await queue.put(_SENTINEL)
+            await asyncio.gather(*workers)
+        except BaseException:
+            # TaskGroup-style teardown: no worker outlives the pipeline
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+
+    async def _iter_token_pages(
+        self, fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield token-paged results, prefetching the next page during each yield."""
+        task: Optional[asyncio.Task] = asyncio.create_task(fetch_page(None))
+        try:
+            while task:
+                data = await task
+                page_token = data.get("next_page_token")
+                task = (
+                    asyncio.create_task(fetch_page(page_token)) if page_token else None
+                )
+                yield data
+        finally:
+            if task:
+                task.cancel()
+
     async def delete_actions(self) -> ResourceStats:
         stats = ResourceStats("actions")
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("actions")
 
         async def fetch_actions_page(offset: int) -> List[Dict[str, Any]]:
@@ -200,47 +392,56 @@ class SafetyCultureNuker:
             )
             return data.get("actions", []) or []
 
-        offset = 0
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            offset = 0
+            in_flight: Deque[asyncio.Task] = deque()
+            try:
+                while True:
+                    # Keep list_concurrency offset pages in flight, consumed in order
+                    while len(in_flight) < self.list_concurrency:
+                        in_flight.append(
+                            asyncio.create_task(fetch_actions_page(offset))
+                        )
+                        offset += ACTION_PAGE_SIZE
+
+                    actions = await in_flight.popleft()
+                    ids: List[str] = []
+                    for action in actions:
+                        task_data = action.get("task", {})
+                        action_id = (
+                            task_data.get("task_id")
+                            or action.get("task_id")
+                            or action.get("id")
+                        )
+                        if action_id:
+                            ids.append(action_id)
 
-        try:
-            while True:
-                actions = await fetch_actions_page(offset)
-                offset += ACTION_PAGE_SIZE
-                ids: List[str] = []
-                for action in actions:
-                    task_data = action.get("task", {})
-                    action_id = (
-                        task_data.get("task_id")
-                        or action.get("task_id")
-                        or action.get("id")
-                    )
-                    if action_id:
-                        ids.append(action_id)
+                    stats.fetched += len(ids)
+                    tracker.add_fetched(len(ids))
 
-                stats.fetched += len(ids)
-                await tracker.add_fetched(len(ids))
+                    for batch in chunked(ids, ACTION_DELETE_BATCH_SIZE):
+                        await emit(batch)
+                        stats.batches += 1
 
-                for batch in chunked(ids, ACTION_DELETE_BATCH_SIZE):
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_actions_batch(batch, stats, tracker)
-                        )
-                    )
-                    stats.batches += 1
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
+                    if len(actions) < ACTION_PAGE_SIZE:
+                        break
+            finally:
+                # Pages past the last short page are not needed
+                for task in in_flight:
+                    task.cancel()
 
-                if len(actions) < ACTION_PAGE_SIZE:
-                    break
+        async def delete(batch: Sequence[str]) -> None:
+            await self._delete_actions_batch(batch, stats, tracker)
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def _delete_actions_batch(
         self,
-        action_ids: List[str],
+        action_ids: Sequence[str],
         stats: ResourceStats,
         tracker: Optional[ProgressTracker],
     ) -> None:
@@ -256,7 +457,7 @@ class SafetyCultureNuker:
                 )
                 stats.deleted += len(action_ids)
                 if tracker:
-                    await tracker.add_deleted(len(action_ids))
+                    tracker.add_deleted(len(action_ids))
             except Exception as error:  # noqa: BLE001
                 stats.record_failure(
                     f"actions {action_ids[:3]}...: {error}", len(action_ids)
@@ -264,19 +465,20 @@ class SafetyCultureNuker:
 
     async def delete_investigations(self) -> ResourceStats:
         stats = ResourceStats("issues")
-        page_token: Optional[str] = None
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("issues")
 
-        try:
-            while True:
-                params: Dict[str, Any] = {"page_size": INVESTIGATION_PAGE_SIZE}
-                if page_token:
-                    params["page_token"] = page_token
+        base_params: Dict[str, Any] = {"page_size": INVESTIGATION_PAGE_SIZE}
 
-                data = await self._request_json(
-                    "GET", "/incidents/v1/investigations", params=params
-                )
+        async def fetch_page(page_token: Optional[str]) -> Dict[str, Any]:
+            params = (
+                {**base_params, "page_token": page_token} if page_token else base_params
+            )
+            return await self._request_json(
+                "GET", "/incidents/v1/investigations", params=params
+            )
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            async for data in self._iter_token_pages(fetch_page):
                 results = data.get("results", []) or []
                 ids = [
                     item.get("investigation_id")
@@ -284,83 +486,69 @@ class SafetyCultureNuker:
                     if item.get("investigation_id")
                 ]
                 stats.fetched += len(ids)
-                await tracker.add_fetched(len(ids))
+                tracker.add_fetched(len(ids))
 
                 for inv_id in ids:
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_single(
-                                f"/incidents/v1/investigations/{inv_id}",
-                                stats,
-                                label=f"investigation {inv_id}",
-                                tracker=tracker,
-                            )
-                        )
-                    )
-
-                if len(delete_tasks) >= DELETE_FLUSH_THRESHOLD:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
-
-                page_token = data.get("next_page_token")
-                if not page_token:
-                    break
+                    await emit(inv_id)
+
+        async def delete(inv_id: str) -> None:
+            await self._delete_single(
+                f"/incidents/v1/investigations/{inv_id}",
+                stats,
+                label=f"investigation {inv_id}",
+                tracker=tracker,
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_inspections(self) -> ResourceStats:
         stats = ResourceStats("inspections")
-        delete_tasks: List[asyncio.Task] = []
-        next_url: Optional[str] = f"{self.base_url}/feed/inspections"
         tracker = ProgressTracker("inspections")
 
-        try:
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            next_url: Optional[str] = "/feed/inspections"
             while next_url:
                 data = await self._request_json("GET", next_url)
                 inspections = data.get("data", []) or []
                 stats.fetched += len(inspections)
-                await tracker.add_fetched(len(inspections))
+                tracker.add_fetched(len(inspections))
 
                 for inspection in inspections:
                     inspection_id = inspection.get("id")
-                    if not inspection_id:
-                        continue
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_single(
-                                f"/inspections/v1/inspections/{inspection_id}",
-                                stats,
-                                label=f"inspection {inspection_id}",
-                                tracker=tracker,
-                                archive_path=f"/inspections/v1/inspections/{inspection_id}/archive",
-                            )
-                        )
-                    )
-
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
+                    if inspection_id:
+                        await emit(inspection_id)
 
                 metadata = data.get("metadata", {}) or {}
-                next_url = build_next_page(self.base_url, metadata.get("next_page"))
+                next_url = build_next_page(metadata.get("next_page"))
+
+        async def delete(inspection_id: str) -> None:
+            await self._delete_single(
+                f"/inspections/v1/inspections/{inspection_id}",
+                stats,
+                label=f"inspection {inspection_id}",
+                tracker=tracker,
+                archive_path=f"/inspections/v1/inspections/{inspection_id}/archive",
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_assets(self) -> ResourceStats:
         stats = ResourceStats("assets")
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("assets")
-        seen_ids: set[str] = set()
+        # Archived pass runs first and is usually the smaller set, so only its
+        # ids are remembered to skip any repeats in the unfiltered pass
+        archived_ids: set[str] = set()
 
-        try:
-            for state_filter in (None, "ASSET_STATE_ARCHIVED"):
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            for state_filter in ("ASSET_STATE_ARCHIVED", None):
                 page_token: Optional[str] = None
                 while True:
                     payload: Dict[str, Any] = {"page_size": ASSET_PAGE_SIZE}
@@ -376,66 +564,66 @@ class SafetyCultureNuker:
                     assets_for_page: List[Tuple[str, bool]] = []
                     for asset in assets:
                         asset_id = asset.get("id")
-                        if not asset_id or asset_id in seen_ids:
+                        if not asset_id or asset_id in archived_ids:
                             continue
-                        seen_ids.add(asset_id)
-                        state = asset.get("state")
                         is_archived = (
-                            state == "ASSET_STATE_ARCHIVED"
-                            or state_filter == "ASSET_STATE_ARCHIVED"
+                            state_filter == "ASSET_STATE_ARCHIVED"
+                            or asset.get("state") == "ASSET_STATE_ARCHIVED"
                         )
+                        if state_filter:
+                            archived_ids.add(asset_id)
                         assets_for_page.append((asset_id, is_archived))
 
                     stats.fetched += len(assets_for_page)
-                    await tracker.add_fetched(len(assets_for_page))
-
-                    for asset_id, is_archived in assets_for_page:
-                        archive_path = (
-                            None
-                            if is_archived
-                            else f"/assets/v1/assets/{asset_id}/archive"
-                        )
-                        task = asyncio.create_task(
-                            self._delete_single(
-                                f"/assets/v1/assets/{asset_id}",
-                                stats,
-                                label=f"asset {asset_id}",
-                                tracker=tracker,
-                                archive_path=archive_path,
-                            )
-                        )
-                        delete_tasks.append(task)
+                    tracker.add_fetched(len(assets_for_page))
 
-                    if delete_tasks:
-                        await asyncio.gather(*delete_tasks)
-                        delete_tasks.clear()
+                    for item in assets_for_page:
+                        await emit(item)
 
                     page_token = data.get("next_page_token")
                     if not page_token:
                         break
 
+        async def delete(item: Tuple[str, bool]) -> None:
+            asset_id, is_archived = item
+            archive_path = (
+                None if is_archived else f"/assets/v1/assets/{asset_id}/archive"
+            )
+            await self._delete_single(
+                f"/assets/v1/assets/{asset_id}",
+                stats,
+                label=f"asset {asset_id}",
+                tracker=tracker,
+                archive_path=archive_path,
+            )
+
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_credentials(self) -> ResourceStats:
         stats = ResourceStats("credentials")
-        page_token: Optional[str] = None
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("credentials")
 
-        try:
-            while True:
-                payload: Dict[str, Any] = {"page_size": CREDENTIAL_PAGE_SIZE}
-                if page_token:
-                    payload["page_token"] = page_token
+        base_payload: Dict[str, Any] = {"page_size": CREDENTIAL_PAGE_SIZE}
 
-                data = await self._request_json(
-                    "POST", "/credentials/v1/credentials", json_body=payload
-                )
+        async def fetch_page(page_token: Optional[str]) -> Dict[str, Any]:
+            payload = (
+                {**base_payload, "page_token": page_token}
+                if page_token
+                else base_payload
+            )
+            return await self._request_json(
+                "POST", "/credentials/v1/credentials", json_body=payload
+            )
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            async for data in self._iter_token_pages(fetch_page):
                 versions = data.get("latest_document_versions", []) or []
                 stats.fetched += len(versions)
-                await tracker.add_fetched(len(versions))
+                tracker.add_fetched(len(versions))
 
                 for version in versions:
                     document_id = version.get("document_id")
@@ -453,53 +641,50 @@ class SafetyCultureNuker:
                             f"credential missing identifiers: doc={document_id}, type={doc_type}, user={user_id}"
                         )
                         continue
-                    params = {
-                        "document_id": document_id,
-                        "document_type_id": doc_type,
-                        "user_id": user_id,
-                    }
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_with_params(
-                                "/credentials/v1/credential",
-                                params,
-                                stats,
-                                label=f"credential {document_id}",
-                                tracker=tracker,
-                            )
-                        )
+                    await emit(
+                        {
+                            "document_id": document_id,
+                            "document_type_id": doc_type,
+                            "user_id": user_id,
+                        }
                     )
 
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
-
-                page_token = data.get("next_page_token")
-                if not page_token:
-                    break
+        async def delete(params: Dict[str, Any]) -> None:
+            await self._delete_with_params(
+                "/credentials/v1/credential",
+                params,
+                stats,
+                label=f"credential {params['document_id']}",
+                tracker=tracker,
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_companies(self) -> ResourceStats:
         stats = ResourceStats("companies")
-        page_token: Optional[str] = None
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("companies")
 
-        try:
-            while True:
-                payload: Dict[str, Any] = {"page_size": COMPANY_PAGE_SIZE}
-                if page_token:
-                    payload["page_token"] = page_token
+        base_payload: Dict[str, Any] = {"page_size": COMPANY_PAGE_SIZE}
 
-                data = await self._request_json(
-                    "POST", "/companies/v1beta/companies", json_body=payload
-                )
+        async def fetch_page(page_token: Optional[str]) -> Dict[str, Any]:
+            payload = (
+                {**base_payload, "page_token": page_token}
+                if page_token
+                else base_payload
+            )
+            return await self._request_json(
+                "POST", "/companies/v1beta/companies", json_body=payload
+            )
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            async for data in self._iter_token_pages(fetch_page):
                 companies = data.get("contractor_company_list", []) or []
                 stats.fetched += len(companies)
-                await tracker.add_fetched(len(companies))
+                tracker.add_fetched(len(companies))
 
                 for company in companies:
                     company_id = company.get("company_id")
@@ -511,33 +696,25 @@ class SafetyCultureNuker:
                     params = {"company_id": company_id}
                     if company_type:
                         params["company_type_id"] = company_type
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_with_params(
-                                "/companies/v1beta/company",
-                                params,
-                                stats,
-                                label=f"company {company_id}",
-                                tracker=tracker,
-                            )
-                        )
-                    )
-
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
-
-                page_token = data.get("next_page_token")
-                if not page_token:
-                    break
+                    await emit(params)
+
+        async def delete(params: Dict[str, Any]) -> None:
+            await self._delete_with_params(
+                "/companies/v1beta/company",
+                params,
+                stats,
+                label=f"company {params['company_id']}",
+                tracker=tracker,
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_osha_cases(self) -> ResourceStats:
         stats = ResourceStats("osha_cases")
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("osha cases")
 
         async def fetch_cases_page(
@@ -552,150 +729,134 @@ class SafetyCultureNuker:
                 "GET", "/incidents/v1/osha/cases", params=params
             )
 
-        page_number = 1
-        in_flight: List[Tuple[int, asyncio.Task]] = []
-        token_mode = False
-        next_token: Optional[str] = None
-
-        try:
-            while True:
-                while len(in_flight) < self.list_concurrency and not token_mode:
-                    in_flight.append(
-                        (
-                            page_number,
-                            asyncio.create_task(
-                                fetch_cases_page(page_number=page_number)
-                            ),
-                        )
-                    )
-                    page_number += 1
-
-                if not in_flight and not token_mode:
-                    break
-
-                if in_flight:
-                    current_page, task = in_flight.pop(0)
-                    data = await task
-                    cases = data.get("results", []) or []
-                    stats.fetched += len(cases)
-                    await tracker.add_fetched(len(cases))
-
-                    for case in cases:
-                        case_id = case.get("case_id") or case.get("id")
-                        if not case_id:
-                            continue
-                        delete_tasks.append(
-                            asyncio.create_task(
-                                self._delete_single(
-                                    f"/incidents/v1/osha/cases/{case_id}",
-                                    stats,
-                                    label=f"osha case {case_id}",
-                                    tracker=tracker,
-                                )
-                            )
-                        )
-                    if delete_tasks:
-                        await asyncio.gather(*delete_tasks)
-                        delete_tasks.clear()
-
-                    next_token = data.get("next_page_token") or next_token
-                    if (
-                        len(cases) < OSHA_PAGE_SIZE
-                        or current_page >= OSHA_MAX_PAGE_NUMBER
-                    ):
-                        token_mode = bool(next_token)
-                        if not token_mode and len(cases) < OSHA_PAGE_SIZE:
-                            break
+        async def emit_cases(
+            emit: Callable[[Any], Awaitable[None]], cases: List[Dict[str, Any]]
+        ) -> None:
+            stats.fetched += len(cases)
+            tracker.add_fetched(len(cases))
+            for case in cases:
+                case_id = case.get("case_id") or case.get("id")
+                if case_id:
+                    await emit(case_id)
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            page_number = 1
+            in_flight: List[Tuple[int, asyncio.Task]] = []
+            token_mode = False
+            next_token: Optional[str] = None
 
-                if token_mode and next_token:
-                    data = await fetch_cases_page(page_token=next_token)
-                    cases = data.get("results", []) or []
-                    stats.fetched += len(cases)
-                    await tracker.add_fetched(len(cases))
-                    for case in cases:
-                        case_id = case.get("case_id") or case.get("id")
-                        if not case_id:
-                            continue
-                        delete_tasks.append(
-                            asyncio.create_task(
-                                self._delete_single(
-                                    f"/incidents/v1/osha/cases/{case_id}",
-                                    stats,
-                                    label=f"osha case {case_id}",
-                                    tracker=tracker,
-                                )
+            try:
+                while True:
+                    while len(in_flight) < self.list_concurrency and not token_mode:
+                        in_flight.append(
+                            (
+                                page_number,
+                                asyncio.create_task(
+                                    fetch_cases_page(page_number=page_number)
+                                ),
                             )
                         )
-                    if delete_tasks:
-                        await asyncio.gather(*delete_tasks)
-                        delete_tasks.clear()
+                        page_number += 1
 
-                    next_token = data.get("next_page_token")
-                    if not next_token:
+                    if not in_flight and not token_mode:
                         break
 
+                    if in_flight:
+                        current_page, task = in_flight.pop(0)
+                        data = await task
+                        cases = data.get("results", []) or []
+                        await emit_cases(emit, cases)
+
+                        next_token = data.get("next_page_token") or next_token
+                        if (
+                            len(cases) < OSHA_PAGE_SIZE
+                            or current_page >= OSHA_MAX_PAGE_NUMBER
+                        ):
+                            token_mode = bool(next_token)
+                            if not token_mode and len(cases) < OSHA_PAGE_SIZE:
+                                break
+
+                    if token_mode and next_token:
+                        data = await fetch_cases_page(page_token=next_token)
+                        await emit_cases(emit, data.get("results", []) or [])
+
+                        next_token = data.get("next_page_token")
+                        if not next_token:
+                            break
+            finally:
+                for _, task in in_flight:
+                    task.cancel()
+
+        async def delete(case_id: str) -> None:
+            await self._delete_single(
+                f"/incidents/v1/osha/cases/{case_id}",
+                stats,
+                label=f"osha case {case_id}",
+                tracker=tracker,
+            )
+
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_templates(self) -> ResourceStats:
         stats = ResourceStats("templates")
-        delete_tasks: List[asyncio.Task] = []
-        next_url: Optional[str] = f"{self.base_url}/feed/templates"
         tracker = ProgressTracker("templates")
 
-        try:
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            next_url: Optional[str] = "/feed/templates"
             while next_url:
                 data = await self._request_json("GET", next_url)
                 templates = data.get("data", []) or []
                 stats.fetched += len(templates)
-                await tracker.add_fetched(len(templates))
+                tracker.add_fetched(len(templates))
 
                 for template in templates:
                     template_id = template.get("id")
-                    if not template_id:
-                        continue
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_single(
-                                f"/templates/v1/templates/{template_id}",
-                                stats,
-                                label=f"template {template_id}",
-                                tracker=tracker,
-                                archive_path=f"/templates/v1/templates/{template_id}/archive",
-                            )
-                        )
-                    )
-
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
+                    if template_id:
+                        await emit(template_id)
 
                 metadata = data.get("metadata", {}) or {}
-                next_url = build_next_page(self.base_url, metadata.get("next_page"))
+                next_url = build_next_page(metadata.get("next_page"))
+
+        async def delete(template_id: str) -> None:
+            await self._delete_single(
+                f"/templates/v1/templates/{template_id}",
+                stats,
+                label=f"template {template_id}",
+                tracker=tracker,
+                archive_path=f"/templates/v1/templates/{template_id}/archive",
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def delete_sites(self) -> ResourceStats:
         stats = ResourceStats("sites")
-        page_token: Optional[str] = None
-        delete_tasks: List[asyncio.Task] = []
         tracker = ProgressTracker("sites")
 
-        try:
-            while True:
-                payload: Dict[str, Any] = {
-                    "limit": SITE_PAGE_SIZE,
-                    "include_deleted_folders": True,
-                }
-                if page_token:
-                    payload["page_token"] = page_token
-
-                data = await self._request_json(
-                    "POST", "/directory/v1/folders/search", json_body=payload
-                )
+        base_payload: Dict[str, Any] = {
+            "limit": SITE_PAGE_SIZE,
+            "include_deleted_folders": True,
+        }
+
+        async def fetch_page(page_token: Optional[str]) -> Dict[str, Any]:
+            payload = (
+                {**base_payload, "page_token": page_token}
+                if page_token
+                else base_payload
+            )
+            return await self._request_json(
+                "POST", "/directory/v1/folders/search", json_body=payload
+            )
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            async for data in self._iter_token_pages(fetch_page):
                 folders = data.get("folders", []) or []
                 ids: List[str] = []
                 for folder_entry in folders:
@@ -707,33 +868,49 @@ class SafetyCultureNuker:
                         ids.append(folder_id)
 
                 stats.fetched += len(ids)
-                await tracker.add_fetched(len(ids))
+                tracker.add_fetched(len(ids))
 
                 for batch in chunked(ids, SITE_DELETE_BATCH_SIZE):
-                    delete_tasks.append(
-                        asyncio.create_task(
-                            self._delete_site_batch(
-                                batch, stats, cascade_up=True, tracker=tracker
-                            )
-                        )
-                    )
+                    await emit(batch)
                     stats.batches += 1
 
-                if delete_tasks:
-                    await asyncio.gather(*delete_tasks)
-                    delete_tasks.clear()
+        async def delete(batch: Sequence[str]) -> None:
+            await self._delete_site_batch(
+                batch, stats, cascade_up=True, tracker=tracker
+            )
 
-                page_token = data.get("next_page_token")
-                if not page_token:
-                    break
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
+            return stats
+        finally:
+            tracker.close()
+
+    async def delete_listed_sites(self, site_ids: Sequence[str]) -> ResourceStats:
+        """Delete given sites on this nuker's session, semaphore and rate gate."""
+        stats = ResourceStats("sites (csv)")
+        tracker = ProgressTracker("csv sites")
+
+        async def produce(emit: Callable[[Any], Awaitable[None]]) -> None:
+            stats.fetched += len(site_ids)
+            tracker.add_fetched(len(site_ids))
+            for batch in chunked(site_ids, SITE_DELETE_BATCH_SIZE):
+                await emit(batch)
+                stats.batches += 1
+
+        async def delete(batch: Sequence[str]) -> None:
+            await self._delete_site_batch(
+                batch, stats, cascade_up=True, tracker=tracker
+            )
 
+        try:
+            await self._pipeline(produce, delete, self.delete_concurrency)
             return stats
         finally:
             tracker.close()
 
     async def _delete_site_batch(
         self,
-        folder_ids: List[str],
+        folder_ids: Sequence[str],
         stats: ResourceStats,
         cascade_up: bool,
         tracker: Optional[ProgressTracker],
@@ -754,7 +931,7 @@ class SafetyCultureNuker:
                 )
                 stats.deleted += len(folder_ids)
                 if tracker:
-                    await tracker.add_deleted(len(folder_ids))
+                    tracker.add_deleted(len(folder_ids))
             except Exception as error:  # noqa: BLE001
                 stats.record_failure(
                     f"sites {folder_ids[:3]}...: {error}", len(folder_ids)
@@ -778,7 +955,7 @@ class SafetyCultureNuker:
                 await self._request_json("DELETE", path, expected_status=(200, 204))
                 stats.deleted += 1
                 if tracker:
-                    await tracker.add_deleted(1)
+                    tracker.add_deleted(1)
             except Exception as error:  # noqa: BLE001
                 stats.record_failure(f"{label}: {error}")
 
@@ -797,7 +974,7 @@ class SafetyCultureNuker:
                 )
                 stats.deleted += 1
                 if tracker:
-                    await tracker.add_deleted(1)
+                    tracker.add_deleted(1)
             except Exception as error:  # noqa: BLE001
                 stats.record_failure(f"{label}: {error}")
 
@@ -807,10 +984,12 @@ def format_run_result(stats: ResourceStats) -> str:
         if stats.failed:
             return f"⚠️ {stats.name}: nothing deleted ({stats.failed} failed)"
         return f"✅ {stats.name}: nothing to delete"
-    status = "✅" if stats.failed == 0 else "⚠️"
-    return (
-        f"{status} {stats.name}: {stats.deleted}/{stats.fetched} deleted "
-        f"({stats.failed} failed)"
+    return _RUN_RESULT(
+        badge="✅" if stats.failed == 0 else "⚠️",
+        name=stats.name,
+        deleted=stats.deleted,
+        fetched=stats.fetched,
+        failed=stats.failed,
     )
 
 
@@ -819,14 +998,24 @@ def format_summary(stats: ResourceStats) -> str:
         if stats.failed:
             return f"⚠️ {stats.name}: nothing deleted ({stats.failed} failed)"
         return f"✅ {stats.name}: nothing to delete"
-    status = "✅" if stats.failed == 0 else "⚠️"
-    batch_info = f", batches {stats.batches}" if stats.batches else ""
-    return (
-        f"{status} {stats.name}: deleted {stats.deleted}/{stats.fetched} "
-        f"(failed {stats.failed}{batch_info})"
+    return (_SUMMARY_BATCHES if stats.batches else _SUMMARY)(
+        badge="✅" if stats.failed == 0 else "⚠️",
+        name=stats.name,
+        deleted=stats.deleted,
+        fetched=stats.fetched,
+        failed=stats.failed,
+        batches=stats.batches,
     )
 
 
+def report_result(stats: ResourceStats) -> None:
+    tqdm.write(f"   {format_run_result(stats)}")
+    for err in stats.errors[:5]:
+        tqdm.write(f"   ⚠️ {err}")
+    if len(stats.errors) > 5:
+        tqdm.write(f"   ... {len(stats.errors) - 5} more errors not shown")
+
+
 async def run_nuke(args: argparse.Namespace) -> None:
     token = args.token or os.environ.get("SC_API_TOKEN") or TOKEN
     if not token:
@@ -834,19 +1023,46 @@ async def run_nuke(args: argparse.Namespace) -> None:
         sys.exit(1)
 
     skip_resources = {item.strip().lower() for item in args.skip.split(",") if item}
-    targets = [
-        ("actions", SafetyCultureNuker.delete_actions),
-        ("issues", SafetyCultureNuker.delete_investigations),
-        ("inspections", SafetyCultureNuker.delete_inspections),
-        ("assets", SafetyCultureNuker.delete_assets),
-        ("credentials", SafetyCultureNuker.delete_credentials),
-        ("companies", SafetyCultureNuker.delete_companies),
-        ("osha_cases", SafetyCultureNuker.delete_osha_cases),
-        ("templates", SafetyCultureNuker.delete_templates),
-        ("sites", SafetyCultureNuker.delete_sites),
+    # Resources in one group run concurrently; groups run in order so inspections
+    # go before their templates and everything that can sit on a site goes first
+    target_groups = [
+        [
+            ("actions", SafetyCultureNuker.delete_actions),
+            ("issues", SafetyCultureNuker.delete_investigations),
+            ("credentials", SafetyCultureNuker.delete_credentials),
+            ("companies", SafetyCultureNuker.delete_companies),
+            ("osha_cases", SafetyCultureNuker.delete_osha_cases),
+        ],
+        [
+            ("inspections", SafetyCultureNuker.delete_inspections),
+            ("assets", SafetyCultureNuker.delete_assets),
+        ],
+        [
+            ("templates", SafetyCultureNuker.delete_templates),
+            ("sites", SafetyCultureNuker.delete_sites),
+        ],
+    ]
+
+    planned = [
+        name
+        for group in target_groups
+        for name, _ in group
+        if name not in skip_resources
     ]
 
-    planned = [name for name, _ in targets if name not in skip_resources]
+    csv_site_ids: List[str] = []
+    if args.sites_csv:
+        if "sites" not in skip_resources:
+            # The full sites sweep would already remove every listed folder
+            print("--sites-csv needs --skip sites; the sites sweep deletes them all.")
+            sys.exit(1)
+        # Read up front so a bad path or header fails before anything is deleted
+        try:
+            csv_site_ids = load_site_ids(args.sites_csv)
+        except (OSError, ValueError) as error:
+            print(f"Could not read --sites-csv: {error}")
+            sys.exit(1)
+        planned.append(f"sites listed in {args.sites_csv} ({len(csv_site_ids)})")
     print("⚠️  This will delete all data for the following resources:")
     for name in planned:
         print(f" - {name}")
@@ -865,18 +1081,34 @@ async def run_nuke(args: argparse.Namespace) -> None:
         list_concurrency=args.list_concurrency,
     ) as nuker:
         summaries: List[ResourceStats] = []
-        for name, method in targets:
-            if name in skip_resources:
+        for group in target_groups:
+            active = [(name, m) for name, m in group if name not in skip_resources]
+            if not active:
                 continue
-            tqdm.write(f"\nDeleting {name}...")
-            stats: ResourceStats = await method(nuker)  # type: ignore[misc]
+            tqdm.write(f"\nDeleting {', '.join(name for name, _ in active)}...")
+            # All share the nuker's delete semaphore, so the global bound holds
+            tasks = [asyncio.create_task(method(nuker)) for _, method in active]
+            try:
+                results: List[ResourceStats] = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                # Siblings that finished before the failure still get reported
+                for task in tasks:
+                    if not task.cancelled() and task.exception() is None:
+                        report_result(task.result())
+                raise
+            for stats in results:
+                summaries.append(stats)
+                report_result(stats)
+
+        if args.sites_csv:
+            # Same loop, session and rate gate as the sweep above
+            tqdm.write(f"\nDeleting sites listed in {args.sites_csv}...")
+            stats = await nuker.delete_listed_sites(csv_site_ids)
             summaries.append(stats)
-            tqdm.write(f"   {format_run_result(stats)}")
-            if stats.errors:
-                for err in stats.errors[:5]:
-                    tqdm.write(f"   ⚠️ {err}")
-                if len(stats.errors) > 5:
-                    tqdm.write(f"   ... {len(stats.errors) - 5} more errors not shown")
+            report_result(stats)
 
     any_failed = any(s.failed > 0 for s in summaries)
     overall_status = "⚠️" if any_failed else "✅"
@@ -921,6 +1153,12 @@ def parse_args() -> argparse.Namespace:
         default=LIST_CONCURRENCY,
         help=f"Concurrent list requests for offset-enabled endpoints (default: {LIST_CONCURRENCY})",
     )
+    parser.add_argument(
+        "--sites-csv",
+        help="Also delete the sites listed in this CSV (siteId column, as used by "
+        "delete_sites) after the sweep, reusing the same session; "
+        "requires --skip sites",
+    )
     return parser.parse_args()
 
 
@@ -1,35 +1,174 @@
+import argparse
+import asyncio
+import csv
+import random
+import sys
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import repeat
 from urllib.parse import urlencode
 
-import pandas as pd
-import requests
+import aiohttp
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pyarrow is optional; stdlib csv reads the input otherwise
+    pa = None
 
 TOKEN = ""  # Set your SafetyCulture API token here
 
+BASE_URL = "https://api.safetyculture.io/directory/v1/folders"
+HEADERS = {"authorization": f"Bearer {TOKEN}", "accept": "application/json"}
+CASCADE = ("cascade_up", "true")
+
+DELETE_CONCURRENCY = 10  # Batches in flight at once
+REQUESTS_PER_SECOND = 20  # Token bucket rate for DELETE calls
+MAX_RETRIES = 5  # Attempts per batch for 429/5xx and network errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 30.0  # seconds
+RETRY_JITTER = 0.5  # up to +50% random spread so retries don't move in lockstep
+RETRY_AFTER_MAX_DELAY = 300.0  # Cap on a server's Retry-After, in seconds
+BATCH_SIZE = 200  # Site IDs per DELETE request
+MAX_QUERY_LENGTH = 8000  # Stay under common proxy/server URL length limits
+OUTPUT_BUFFER_SIZE = 1 << 20  # Bytes of output rows held before hitting disk
+LOG_FLUSH_LINES = 32  # Status lines collected before one stdout write
+
+_log_buffer = []
+
+
+class TokenBucketRateLimiter:
+    """
+    Lock-free token bucket: each caller claims the next time slot and sleeps to it.
+    Bursts up to burst_size run at once; pause() holds every slot back after a 429.
+    """
+
+    def __init__(self, requests_per_second, burst_size=None):
+        self._interval = 1.0 / requests_per_second
+        self.burst_size = burst_size or requests_per_second
+        self._burst_window = (self.burst_size - 1) * self._interval
+        self._next_slot_time = time.monotonic() - self._burst_window
 
-def delete_sites_batch(site_ids, batch_number, total_batches):
+    async def acquire(self):
+        now = time.monotonic()
+        slot = max(self._next_slot_time, now - self._burst_window)
+        self._next_slot_time = slot + self._interval
+
+        wait_time = slot - now
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def pause(self, seconds):
+        self._next_slot_time = max(self._next_slot_time, time.monotonic() + seconds)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
     try:
-        base_url = "https://api.safetyculture.io/directory/v1/folders"
-        params = [("folder_ids", site_id) for site_id in site_ids]
-        params.append(("cascade_up", "true"))
-        query_string = urlencode(params)
-        url = f"{base_url}?{query_string}"
-        headers = {
-            "authorization": f"Bearer {TOKEN}",
-            "accept": "application/json",
-        }
-        response = requests.delete(url, headers=headers)
-        response.raise_for_status()
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 1.0
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def delete_sites_batch(session, limiter, site_ids, batch_number, total_batches):
+    """Send one DELETE for a batch; returns (status, error), error None on success."""
+    try:
+        await limiter.acquire()
+        async with session.delete(BASE_URL, params=build_params(site_ids)) as response:
+            retry_after = response.headers.get("Retry-After")
+            if response.status == 429 or (
+                retry_after and response.status in RETRY_STATUS_CODES
+            ):
+                # Push every caller's next slot past the server's window
+                limiter.pause(
+                    min(parse_retry_after(retry_after), RETRY_AFTER_MAX_DELAY)
+                )
+            if response.status >= 400:
+                text = await response.text(errors="replace")
+                status = (
+                    f"Batch {batch_number}/{total_batches} - "
+                    f"Error: {response.status} {response.reason} - Response: {text}"
+                )
+                return status, response.status
         status = f"Batch {batch_number}/{total_batches} - Deleted {len(site_ids)} sites"
-        print(status)
-        return status, site_ids, None
-    except requests.exceptions.RequestException as error:
-        error_detail = ""
-        if hasattr(error, "response") and hasattr(error.response, "text"):
-            error_detail = f" - Response: {error.response.text}"
-        status = f"Batch {batch_number}/{total_batches} - Error: {error}{error_detail}"
-        print(status)
-        return status, site_ids, error
+        return status, None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        status = f"Batch {batch_number}/{total_batches} - Error: {error!r}"
+        return status, error
+
+
+def log(message, flush=False):
+    _log_buffer.append(message)
+    if flush or len(_log_buffer) >= LOG_FLUSH_LINES:
+        flush_log()
+
+
+def flush_log():
+    if _log_buffer:
+        sys.stdout.write("\n".join(_log_buffer) + "\n")
+        sys.stdout.flush()
+        _log_buffer.clear()
+
+
+def is_retryable(error):
+    return not isinstance(error, int) or error in RETRY_STATUS_CODES
+
+
+def backoff_delay(attempt):
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+    return delay * (1 + random.random() * RETRY_JITTER)
+
+
+def requeue(queue, item):
+    # Put the retry back before retiring the original so join() can't finish early
+    queue.put_nowait(item)
+    queue.task_done()
+
+
+async def batch_worker(queue, session, limiter, writer, total_batches):
+    """Drain batches from the queue; retryable failures rejoin it after a backoff."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch_number, site_ids, attempt = await queue.get()
+        retrying = False
+        try:
+            status, error = await delete_sites_batch(
+                session, limiter, site_ids, batch_number, total_batches
+            )
+            if error is not None and attempt < MAX_RETRIES and is_retryable(error):
+                delay = backoff_delay(attempt)
+                log(f"{status} - retry {attempt}/{MAX_RETRIES} in {delay:.1f}s")
+                # Scheduled rather than slept so this worker moves on meanwhile
+                loop.call_later(
+                    delay, requeue, queue, (batch_number, site_ids, attempt + 1)
+                )
+                retrying = True
+                continue
+            # Failures show up right away; successes go out in blocks
+            log(status, flush=error is not None)
+            result = "Deleted" if error is None else "Failed"
+            # Column-wise rows: the batch fields repeat, only the site id varies
+            writer.writerows(
+                zip(site_ids, repeat(batch_number), repeat(result), repeat(status))
+            )
+        finally:
+            if not retrying:
+                queue.task_done()
+
+
+def build_params(site_ids):
+    params = [("folder_ids", site_id) for site_id in site_ids]
+    params.append(CASCADE)
+    return params
 
 
 def chunk_list(lst, chunk_size):
@@ -37,40 +176,152 @@ def chunk_list(lst, chunk_size):
         yield lst[i : i + chunk_size]
 
 
-def main():
-    csv_data = pd.read_csv("input.csv")
-    site_ids = csv_data["siteId"].tolist()
+def fit_query_length(batch):
+    """Halve a batch until its encoded query string fits MAX_QUERY_LENGTH."""
+    if len(batch) <= 1 or len(urlencode(build_params(batch))) < MAX_QUERY_LENGTH:
+        yield batch
+        return
+    middle = len(batch) // 2
+    yield from fit_query_length(batch[:middle])
+    yield from fit_query_length(batch[middle:])
+
+
+def load_site_ids(csv_path="input.csv"):
+    if pa is not None:
+        # Multithreaded Arrow parser; only the siteId column is materialized
+        table = pa_csv.read_csv(
+            csv_path,
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=["siteId"], column_types={"siteId": pa.string()}
+            ),
+        )
+        return [site_id for site_id in table.column("siteId").to_pylist() if site_id]
+    with open(csv_path, newline="", encoding="utf-8-sig") as csvfile:
+        return [row["siteId"] for row in csv.DictReader(csvfile) if row["siteId"]]
+
+
+async def delete_sites_from_csv(
+    session,
+    csv_path="input.csv",
+    output_file="output.csv",
+    delete_concurrency=DELETE_CONCURRENCY,
+    batch_size=BATCH_SIZE,
+    output_buffer_size=OUTPUT_BUFFER_SIZE,
+):
+    """Delete the sites listed in csv_path over an existing, authorized session."""
+    raw_site_ids = load_site_ids(csv_path)
+    # Exported CSVs often repeat rows; dict.fromkeys keeps first-seen order
+    site_ids = list(dict.fromkeys(raw_site_ids))
+    duplicates = len(raw_site_ids) - len(site_ids)
+    if duplicates:
+        print(f"Removed {duplicates} duplicate site IDs")
     total_sites = len(site_ids)
-    batch_size = 50
-    batches = list(chunk_list(site_ids, batch_size))
+    batches = [
+        part
+        for batch in chunk_list(site_ids, batch_size)
+        for part in fit_query_length(batch)
+    ]
     total_batches = len(batches)
+    # fit_query_length may have split batches below the requested size
+    effective_batch_size = max(map(len, batches), default=0)
 
     print(f"Total sites to delete: {total_sites}")
-    print(f"Batch size: {batch_size}")
+    if effective_batch_size < batch_size:
+        print(f"Batch size: {effective_batch_size} (requested {batch_size})")
+    else:
+        print(f"Batch size: {batch_size}")
     print(f"Total batches: {total_batches}")
+    print(f"Concurrency: {delete_concurrency}")
     print("-" * 50)
 
-    output_file = "output.csv"
-    results = []
-
-    for batch_number, batch in enumerate(batches, start=1):
-        status, deleted_ids, error = delete_sites_batch(
-            batch, batch_number, total_batches
-        )
-        for site_id in deleted_ids:
-            results.append(
-                {
-                    "SiteID": site_id,
-                    "Batch": batch_number,
-                    "Status": "Deleted" if error is None else "Failed",
-                    "Details": status,
-                }
+    limiter = TokenBucketRateLimiter(REQUESTS_PER_SECOND)
+    # Large buffer: rows reach disk in big blocks, flushed on close
+    with open(
+        output_file,
+        "w",
+        buffering=output_buffer_size,
+        newline="",
+        encoding="utf-8",
+    ) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["SiteID", "Batch", "Status", "Details"])
+        queue = asyncio.Queue()
+        for batch_number, batch in enumerate(batches, start=1):
+            queue.put_nowait((batch_number, batch, 1))
+        # Each worker holds one request at a time, so the pool size is
+        # the delete concurrency; retries never block fresh batches
+        workers = [
+            asyncio.create_task(
+                batch_worker(queue, session, limiter, writer, total_batches)
             )
-        time.sleep(0.2)
+            for _ in range(delete_concurrency)
+        ]
+        join_task = asyncio.create_task(queue.join())
+        try:
+            # Workers only exit by raising; surface that instead of waiting forever
+            await asyncio.wait(
+                [join_task, *workers], return_when=asyncio.FIRST_COMPLETED
+            )
+            for worker in workers:
+                if worker.done():
+                    worker.result()
+        finally:
+            join_task.cancel()
+            for worker in workers:
+                worker.cancel()
+            flush_log()
 
-    pd.DataFrame(results).to_csv(output_file, index=False)
     print("-" * 50)
     print(f"Results saved to {output_file}")
 
 
-main()
+async def main(args):
+    # One warm keep-alive connection per worker; outlives the longest retry backoff
+    connector = aiohttp.TCPConnector(
+        limit=args.delete_concurrency, keepalive_timeout=75, ttl_dns_cache=600
+    )
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        await delete_sites_from_csv(
+            session,
+            delete_concurrency=args.delete_concurrency,
+            batch_size=args.batch_size,
+            output_buffer_size=args.output_buffer_size,
+        )
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Delete SafetyCulture sites listed in input.csv."
+    )
+    parser.add_argument(
+        "--delete-concurrency",
+        type=positive_int,
+        default=DELETE_CONCURRENCY,
+        help=f"Concurrent delete requests (default: {DELETE_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=positive_int,
+        default=BATCH_SIZE,
+        help=f"Site IDs per request, split further if the URL gets too long "
+        f"(default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--output-buffer-size",
+        type=positive_int,
+        default=OUTPUT_BUFFER_SIZE,
+        help=f"Bytes of output.csv buffered before each write "
+        f"(default: {OUTPUT_BUFFER_SIZE})",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))